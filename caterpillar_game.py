@@ -1,7 +1,8 @@
 import pygame
 import random
 import math
-from enum import Enum
+import sys
+from collections import deque
 
 # Initialize Pygame
 pygame.init()
@@ -23,35 +24,38 @@ GREEN = (0, 200, 0)
 LIME = (150, 255, 0)
 BROWN = (101, 67, 33)
 
-# Direction enum
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+# Directions as plain (dx, dy) tuples
+DIR_UP = (0, -1)
+DIR_DOWN = (0, 1)
+DIR_LEFT = (-1, 0)
+DIR_RIGHT = (1, 0)
+OPPOSITE = {DIR_UP: DIR_DOWN, DIR_DOWN: DIR_UP, DIR_LEFT: DIR_RIGHT, DIR_RIGHT: DIR_LEFT}
 
 class Caterpillar:
     def __init__(self):
-        self.body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = Direction.RIGHT
+        self.body = deque([(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
+        self.body_set = set(self.body)
+        self.direction = DIR_RIGHT
         self.grow = False
     
     def move(self):
         head_x, head_y = self.body[0]
-        dx, dy = self.direction.value
+        dx, dy = self.direction
         new_head = (head_x + dx, head_y + dy)
         
-        self.body.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self.body_set.add(new_head)
         if not self.grow:
-            self.body.pop()
+            tail = self.body.pop()
+            # Head moved into the cell the tail just vacated; keep it in the set
+            if tail != new_head:
+                self.body_set.discard(tail)
         else:
             self.grow = False
     
     def change_direction(self, new_direction):
         # Prevent moving in opposite direction
-        dx_current, dy_current = self.direction.value
-        dx_new, dy_new = new_direction.value
-        if (dx_current, dy_current) != (-dx_new, -dy_new):
+        if OPPOSITE[self.direction] != new_direction:
             self.direction = new_direction
     
     def check_collision(self):
@@ -59,8 +63,8 @@ class Caterpillar:
         # Check wall collision
         if head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT:
             return True
-        # Check self collision
-        if self.body[0] in self.body[1:]:
+        # Check self collision (a repeated cell collapses in the set)
+        if len(self.body_set) != len(self.body):
             return True
         return False
     
@@ -86,10 +90,9 @@ class Food:
     def start_explosion(self):
         self.exploding = True
         # Create explosion particles
-        for _ in range(15):
+        for color in random.choices([RED, ORANGE, YELLOW], k=15):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(2, 8)
-            color = random.choice([RED, ORANGE, YELLOW])
             self.explosion_particles.append({
                 'x': self.position[0] * GRID_SIZE + GRID_SIZE // 2,
                 'y': self.position[1] * GRID_SIZE + GRID_SIZE // 2,
@@ -174,13 +177,23 @@ def game_over_screen(screen, score, font):
     screen.blit(restart_text, (WINDOW_WIDTH // 2 - restart_text.get_width() // 2, WINDOW_HEIGHT // 2 + 60))
 
 def main():
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    vsync = 0 if '--no-vsync' in sys.argv[1:] else 1
+    try:
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync=vsync)
+    except pygame.error:
+        # No vsync-capable renderer; clock.tick below still caps the frame rate
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED)
     pygame.display.set_caption('Caterpillar Game')
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 36)
     
+    # Grid never changes, so render it once
+    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    background.fill(BLACK)
+    draw_grid(background)
+    
     caterpillar = Caterpillar()
-    food = Food(caterpillar.body)
+    food = Food(caterpillar.body_set)
     score = 0
     game_over = False
     
@@ -195,7 +208,7 @@ def main():
                     if event.key == pygame.K_SPACE:
                         # Restart game
                         caterpillar = Caterpillar()
-                        food = Food(caterpillar.body)
+                        food = Food(caterpillar.body_set)
                         score = 0
                         game_over = False
                     elif event.key == pygame.K_ESCAPE:
@@ -204,29 +217,29 @@ def main():
                 else:
                     # Arrow keys
                     if event.key == pygame.K_UP:
-                        caterpillar.change_direction(Direction.UP)
+                        caterpillar.change_direction(DIR_UP)
                     elif event.key == pygame.K_DOWN:
-                        caterpillar.change_direction(Direction.DOWN)
+                        caterpillar.change_direction(DIR_DOWN)
                     elif event.key == pygame.K_LEFT:
-                        caterpillar.change_direction(Direction.LEFT)
+                        caterpillar.change_direction(DIR_LEFT)
                     elif event.key == pygame.K_RIGHT:
-                        caterpillar.change_direction(Direction.RIGHT)
+                        caterpillar.change_direction(DIR_RIGHT)
                     # WASD keys
                     elif event.key == pygame.K_w:
-                        caterpillar.change_direction(Direction.UP)
+                        caterpillar.change_direction(DIR_UP)
                     elif event.key == pygame.K_s:
-                        caterpillar.change_direction(Direction.DOWN)
+                        caterpillar.change_direction(DIR_DOWN)
                     elif event.key == pygame.K_a:
-                        caterpillar.change_direction(Direction.LEFT)
+                        caterpillar.change_direction(DIR_LEFT)
                     elif event.key == pygame.K_d:
-                        caterpillar.change_direction(Direction.RIGHT)
+                        caterpillar.change_direction(DIR_RIGHT)
         
         if not game_over:
             # Update explosion if active
             if food.exploding:
                 if food.update_explosion():
                     # Explosion finished, generate new food
-                    food = Food(caterpillar.body)
+                    food = Food(caterpillar.body_set)
             else:
                 caterpillar.move()
                 
@@ -237,8 +250,7 @@ def main():
                     score += 10
                     food.start_explosion()
             
-            screen.fill(BLACK)
-            draw_grid(screen)
+            screen.blit(background, (0, 0))
             draw_caterpillar(screen, caterpillar)
             draw_food(screen, food)
             draw_score(screen, score, font)
@@ -1,13 +1,16 @@
 # hungry_caterpillar_explodo.py
 # A hungry-caterpillar-inspired Snake spinoff with explosive food and debris obstacles.
-# Requires: pygame (pip install pygame)
+# Requires: Python 3.10+, pygame (pip install pygame)
 
 import math
 import random
 import sys
+import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Deque, List, Optional, Tuple
 from collections import deque
+from itertools import islice
 
 import pygame
 
@@ -18,6 +21,7 @@ GRID_W, GRID_H = 28, 20         # grid size
 TILE = 28                       # pixel size per cell
 MARGIN = 24                     # pixels margin around playfield
 FPS = 14                        # base frames per second (snake tick speed)
+RENDER_FPS = 60                 # input polling / drawing rate, decoupled from the snake tick
 SCREEN_W = GRID_W * TILE + MARGIN * 2
 SCREEN_H = GRID_H * TILE + MARGIN * 2
 FONT_NAME = "freesansbold.ttf"
@@ -42,9 +46,13 @@ NITRO_DEBRIS_MAX = 12
 NITRO_SPAWN_CHANCE = 0.40  # chance next food is nitro instead of leaf
 
 # Screen shake tuning
-SHAKE_DECAY = 0.85
+SHAKE_DECAY = 0.85  # per snake tick (1/FPS s)
 SHAKE_POWER = 10
 
+# Per-cell pixel lookups (top-left and center), indexed [y][x]
+CELL_PX = [[(MARGIN + x * TILE, MARGIN + y * TILE) for x in range(GRID_W)] for y in range(GRID_H)]
+CELL_CENTER = [[(px + TILE // 2, py + TILE // 2) for px, py in row] for row in CELL_PX]
+
 random.seed()
 
 
@@ -52,8 +60,7 @@ random.seed()
 # Utility
 # ----------------------------
 def grid_to_px(cell: Tuple[int, int]) -> Tuple[int, int]:
-    x, y = cell
-    return (MARGIN + x * TILE, MARGIN + y * TILE)
+    return CELL_PX[cell[1]][cell[0]]
 
 def clamp(v, lo, hi):
     return lo if v < lo else hi if v > hi else v
@@ -61,11 +68,14 @@ def clamp(v, lo, hi):
 def within_bounds(x, y):
     return 0 <= x < GRID_W and 0 <= y < GRID_H
 
+def blend(a, b, t):
+    return tuple(int(a[i] + (b[i] - a[i]) * t) for i in range(3))
+
 
 # ----------------------------
 # Entities
 # ----------------------------
-@dataclass
+@dataclass(slots=True)
 class Explosion:
     center: Tuple[int, int]
     radius_tiles: float
@@ -76,7 +86,7 @@ class Explosion:
         return self.t < self.duration
 
 
-@dataclass
+@dataclass(slots=True)
 class Food:
     pos: Tuple[int, int]
     kind: str  # "leaf" or "nitro"
@@ -84,7 +94,38 @@ class Food:
     fuse: float = 0.0       # seconds left (for nitro only)
     fuse_total: float = 0.0 # initial fuse (for bar)
 
-@dataclass
+class FreeCells:
+    # Set of cells with O(1) add/discard and uniform random pick (list + index map, swap-pop)
+    __slots__ = ("_cells", "_index")
+
+    def __init__(self, cells=()):
+        self._cells: List[Tuple[int, int]] = list(cells)
+        self._index = {cell: i for i, cell in enumerate(self._cells)}
+
+    def __contains__(self, cell):
+        return cell in self._index
+
+    def __len__(self):
+        return len(self._cells)
+
+    def add(self, cell: Tuple[int, int]):
+        if cell not in self._index:
+            self._index[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell: Tuple[int, int]):
+        i = self._index.pop(cell, None)
+        if i is None:
+            return
+        last = self._cells.pop()
+        if i < len(self._cells):
+            self._cells[i] = last
+            self._index[last] = i
+
+    def choice(self) -> Tuple[int, int]:
+        return random.choice(self._cells)
+
+@dataclass(slots=True)
 class GameState:
     snake: Deque[Tuple[int, int]] = field(default_factory=deque)
     dir: Tuple[int, int] = (1, 0)
@@ -96,8 +137,10 @@ class GameState:
     alive: bool = True
     paused: bool = False
     explosions: List[Explosion] = field(default_factory=list)
-    particles: List[Tuple[float, float, float, float, float]] = field(default_factory=list)  # x,y,vx,vy,life
+    particles: List[List[float]] = field(default_factory=list)  # x,y,vx,vy,life,r,g,b
     shake: float = 0.0
+    free_cells: FreeCells = field(default_factory=FreeCells)  # cells not taken by snake, rocks or food
+    new_rocks: List[Tuple[int, int]] = field(default_factory=list)  # not yet stamped on the rocks layer
 
 
 # ----------------------------
@@ -110,21 +153,28 @@ def spawn_snake(gs: GameState):
         gs.snake.append((cx - i, cy))
     gs.dir = (1, 0)
     gs.grow = 0
+    reset_free_cells(gs)
 
-def empty_cells(gs: GameState) -> List[Tuple[int, int]]:
+def reset_free_cells(gs: GameState):
+    # One full scan; afterwards free_cells is kept in sync incrementally
     occ = set(gs.snake) | gs.rocks
     if gs.food:
         occ.add(gs.food.pos)
-    return [(x, y) for y in range(GRID_H) for x in range(GRID_W) if (x, y) not in occ]
+    gs.free_cells = FreeCells((x, y) for y in range(GRID_H) for x in range(GRID_W) if (x, y) not in occ)
 
 def rand_empty(gs: GameState) -> Optional[Tuple[int, int]]:
-    cells = empty_cells(gs)
-    return random.choice(cells) if cells else None
+    return gs.free_cells.choice() if gs.free_cells else None
+
+def add_rock(gs: GameState, p: Tuple[int, int]):
+    gs.rocks.add(p)
+    gs.free_cells.discard(p)
+    gs.new_rocks.append(p)
 
 def spawn_food(gs: GameState, force_leaf: bool = False):
     pos = rand_empty(gs)
     if not pos:
         return
+    gs.free_cells.discard(pos)
     if not force_leaf and random.random() < NITRO_SPAWN_CHANCE:
         fuse = random.uniform(NITRO_MIN_FUSE, NITRO_MAX_FUSE)
         gs.food = Food(pos=pos, kind="nitro", fuse=fuse, fuse_total=fuse)
@@ -135,38 +185,31 @@ def spawn_rocks(gs: GameState, n: int):
     for _ in range(n):
         p = rand_empty(gs)
         if p:
-            gs.rocks.add(p)
+            add_rock(gs, p)
 
 def step_snake(gs: GameState):
     if not gs.alive or gs.paused:
         return
     hx, hy = gs.snake[-1]
     dx, dy = gs.dir
-    nx, ny = hx + dx, hy + dy
-    if not within_bounds(nx, ny):
-        gs.alive = False
-        return
-    new_head = (nx, ny)
-
-    # self-collision
-    if new_head in gs.snake:
-        gs.alive = False
-        return
+    new_head = (hx + dx, hy + dy)
+    food = gs.food
 
-    # rock collision
-    if new_head in gs.rocks:
+    # wall / self / rock collision: anything that is neither free nor food is solid
+    if new_head not in gs.free_cells and (not food or new_head != food.pos):
         gs.alive = False
         return
 
     gs.snake.append(new_head)
+    gs.free_cells.discard(new_head)
     if gs.grow > 0:
         gs.grow -= 1
     else:
-        gs.snake.popleft()
+        gs.free_cells.add(gs.snake.popleft())
 
     # food check
-    if gs.food and new_head == gs.food.pos:
-        if gs.food.kind == "leaf":
+    if food and new_head == food.pos:
+        if food.kind == "leaf":
             gs.grow += 1
             gs.score += 10
             burst_particles(gs, new_head, count=10, speed=120, color=SAFE_LEAF_COLOR)
@@ -186,53 +229,61 @@ def trigger_explosion(gs: GameState, center: Tuple[int, int], player_trigger=Fal
     # Debris ring
     debris_n = random.randint(NITRO_DEBRIS_MIN, NITRO_DEBRIS_MAX)
     ring_positions = ring_cells(center, radius=NITRO_BLAST_RADIUS)
-    random.shuffle(ring_positions)
-    for p in ring_positions[:debris_n]:
-        if p not in gs.snake and p not in gs.rocks and within_bounds(*p):
-            gs.rocks.add(p)
+    for p in random.sample(ring_positions, min(debris_n, len(ring_positions))):
+        if p in gs.free_cells:
+            add_rock(gs, p)
 
-    # Player too close? (blast = Euclidean radius)
+    # Player too close? (blast = Euclidean radius, compared squared)
     hx, hy = gs.snake[-1]
-    if dist(center, (hx, hy)) <= NITRO_BLAST_RADIUS:
+    if (hx - center[0]) ** 2 + (hy - center[1]) ** 2 <= NITRO_BLAST_RADIUS ** 2:
         gs.alive = False
 
-def dist(a: Tuple[int, int], b: Tuple[int, int]) -> float:
-    return math.hypot(a[0]-b[0], a[1]-b[1])
+def ring_offsets(radius: float) -> List[Tuple[int, int]]:
+    r2 = radius ** 2
+    reach = math.ceil(radius) + 1
+    return [(dx, dy)
+            for dy in range(-reach, reach + 1)
+            for dx in range(-reach, reach + 1)
+            if r2 * 0.6 <= dx * dx + dy * dy <= r2 * 1.3]
+
+# The blast radius is fixed, so its ring shape only needs computing once
+RING_OFFSETS = ring_offsets(NITRO_BLAST_RADIUS)
 
-def ring_cells(center: Tuple[int, int], radius: float) -> List[Tuple[int, int]]:
+def ring_cells(center: Tuple[int, int], radius: float = NITRO_BLAST_RADIUS) -> List[Tuple[int, int]]:
     cx, cy = center
-    cells = []
-    r2 = radius ** 2
-    for y in range(cy - math.ceil(radius) - 1, cy + math.ceil(radius) + 2):
-        for x in range(cx - math.ceil(radius) - 1, cx + math.ceil(radius) + 2):
-            if within_bounds(x, y):
-                d2 = (x - cx) ** 2 + (y - cy) ** 2
-                if r2 * 0.6 <= d2 <= r2 * 1.3:
-                    cells.append((x, y))
-    return cells
+    offsets = RING_OFFSETS if radius == NITRO_BLAST_RADIUS else ring_offsets(radius)
+    return [(cx + dx, cy + dy) for dx, dy in offsets if within_bounds(cx + dx, cy + dy)]
+
+# Unit vectors for particle bursts; 64 headings is indistinguishable from continuous
+BURST_DIRS = [(math.cos(i * math.tau / 64), math.sin(i * math.tau / 64)) for i in range(64)]
 
 def burst_particles(gs: GameState, cell: Tuple[int, int], count=8, speed=120, color=(255,255,255)):
-    px, py = grid_to_px(cell)
-    cx, cy = px + TILE/2, py + TILE/2
-    for _ in range(count):
-        ang = random.uniform(0, math.tau)
+    cx, cy = CELL_CENTER[cell[1]][cell[0]]
+    for ux, uy in random.choices(BURST_DIRS, k=count):
         v = random.uniform(speed*0.6, speed*1.2)
-        vx, vy = math.cos(ang)*v, math.sin(ang)*v
         life = random.uniform(0.25, 0.6)
-        gs.particles.append([cx, cy, vx, vy, life, *color])
+        gs.particles.append([cx, cy, ux*v, uy*v, life, *color])
 
 def update_particles(gs: GameState, dt: float):
     g = 420  # gravity for a playful arc
-    newp = []
-    for p in gs.particles:
-        x, y, vx, vy, life, r, gcol, b = p
-        life -= dt
-        if life > 0:
-            vy += g * dt * 0.25
-            x += vx * dt
-            y += vy * dt
-            newp.append([x, y, vx, vy, life, r, gcol, b])
-    gs.particles = newp
+    dvy = g * dt * 0.25
+    # Integrate in place; each particle is a mutable [x, y, vx, vy, life, r, g, b].
+    # Dead particles are swapped with the last live one and trimmed off the end.
+    parts = gs.particles
+    n = len(parts)
+    i = 0
+    while i < n:
+        p = parts[i]
+        p[4] -= dt
+        if p[4] <= 0:
+            n -= 1
+            parts[i] = parts[n]
+            continue
+        p[3] += dvy
+        p[0] += p[2] * dt
+        p[1] += p[3] * dt
+        i += 1
+    del parts[n:]
 
 def update_food(gs: GameState, dt: float):
     if not gs.food:
@@ -242,6 +293,7 @@ def update_food(gs: GameState, dt: float):
         if gs.food.fuse <= 0:
             # BOOM where it stands
             trigger_explosion(gs, gs.food.pos, player_trigger=False)
+            gs.free_cells.add(gs.food.pos)
             gs.food = None
             # After an explosion, spawn a *leaf* to give reprieve
             spawn_food(gs, force_leaf=True)
@@ -257,99 +309,159 @@ def draw_grid(surf):
         xpx = MARGIN + x * TILE
         pygame.draw.line(surf, GRID_COLOR, (xpx, MARGIN), (xpx, MARGIN + GRID_H * TILE), 1)
 
-def draw_cell(surf, cell, color, inset=3, border_radius=6):
-    x, y = grid_to_px(cell)
-    rect = pygame.Rect(x + inset, y + inset, TILE - inset*2, TILE - inset*2)
-    pygame.draw.rect(surf, color, rect, border_radius=border_radius)
-    return rect
+# ----------------------------
+# Sprites (drawn once, blitted per cell)
+# ----------------------------
+HEAD_PAD = 8  # head glow spills past its tile
 
-def draw_food(surf, f: Food, t: float):
+def make_cell_sprite(color, inset, border_radius, pad=0):
+    surf = pygame.Surface((TILE + pad*2, TILE + pad*2), pygame.SRCALPHA)
+    rect = pygame.Rect(pad + inset, pad + inset, TILE - inset*2, TILE - inset*2)
+    pygame.draw.rect(surf, color, rect, border_radius=border_radius)
+    return surf, rect
+
+def make_rock_sprite():
+    surf, rect = make_cell_sprite(ROCK_COLOR, inset=5, border_radius=6)
+    # Cracks
+    pygame.draw.line(surf, (80,80,95), (rect.left+4, rect.centery), (rect.centerx, rect.top+4), 2)
+    pygame.draw.line(surf, (80,80,95), (rect.centerx, rect.top+4), (rect.right-4, rect.bottom-4), 2)
+    return surf
+
+def make_leaf_sprite():
+    surf, rect = make_cell_sprite(SAFE_LEAF_COLOR, inset=4, border_radius=8)
+    # Leaf vein
+    pygame.draw.line(surf, (40, 140, 60), rect.midleft, rect.midright, 2)
+    return surf
+
+def make_head_sprite():
+    surf = pygame.Surface((TILE + HEAD_PAD*2, TILE + HEAD_PAD*2), pygame.SRCALPHA)
+    center = (HEAD_PAD + TILE//2, HEAD_PAD + TILE//2)
+    # glow
+    pygame.draw.circle(surf, (0,0,0), center, TILE//2 + 8)
+    pygame.draw.circle(surf, (60, 200, 160), center, TILE//2 + 6, width=3)
+    cell = pygame.Rect(HEAD_PAD + 4, HEAD_PAD + 4, TILE - 8, TILE - 8)
+    pygame.draw.rect(surf, HEAD_COLOR, cell, border_radius=9)
+    # eyes
+    rect = pygame.Rect(HEAD_PAD+6, HEAD_PAD+6, TILE-12, TILE-12)
+    pygame.draw.circle(surf, (255,255,255), (rect.left+6, rect.centery), 3)
+    pygame.draw.circle(surf, (255,255,255), (rect.right-6, rect.centery), 3)
+    pygame.draw.circle(surf, (30,30,30), (rect.left+6, rect.centery), 1)
+    pygame.draw.circle(surf, (30,30,30), (rect.right-6, rect.centery), 1)
+    return surf
+
+ROCK_SURF = make_rock_sprite()
+LEAF_SURF = make_leaf_sprite()
+BODY_SURF, _ = make_cell_sprite(BODY_COLOR, inset=5, border_radius=8)
+HEAD_SURF = make_head_sprite()
+
+# Nitro pulse: one period of sin(t*8) sampled into 32 pre-rendered frames
+NITRO_FRAMES = 32
+NITRO_FRAME_RATE = 8 / math.tau * NITRO_FRAMES  # frames per second of t
+NITRO_PALETTE = [blend(NITRO_COLOR, (255, 100, 0),
+                       (math.sin(i / NITRO_FRAMES * math.tau) * 0.5 + 0.5) * 0.35 + 0.5)
+                 for i in range(NITRO_FRAMES)]
+
+def make_nitro_sprite(color):
+    surf, rect = make_cell_sprite(color, inset=4, border_radius=8)
+    # Spark glint
+    pygame.draw.circle(surf, NITRO_SPARK, rect.center, 4)
+    return surf
+
+NITRO_SURFS = [make_nitro_sprite(c) for c in NITRO_PALETTE]
+
+def build_assets():
+    # Match the sprites to the display's pixel format so blits skip per-pixel
+    # conversion. Needs a display mode, so main() calls this after set_mode.
+    global ROCK_SURF, LEAF_SURF, BODY_SURF, HEAD_SURF
+    ROCK_SURF = ROCK_SURF.convert_alpha()
+    LEAF_SURF = LEAF_SURF.convert_alpha()
+    BODY_SURF = BODY_SURF.convert_alpha()
+    HEAD_SURF = HEAD_SURF.convert_alpha()
+    NITRO_SURFS[:] = [s.convert_alpha() for s in NITRO_SURFS]
+
+def draw_food(surf, f: Food, t: float, ox=0, oy=0):
+    px, py = CELL_PX[f.pos[1]][f.pos[0]]
+    px, py = px + ox, py + oy
     if f.kind == "leaf":
-        rect = draw_cell(surf, f.pos, SAFE_LEAF_COLOR, inset=4, border_radius=8)
-        # Leaf vein
-        pygame.draw.line(surf, (40, 140, 60), rect.midleft, rect.midright, 2)
+        surf.blit(LEAF_SURF, (px, py))
     else:
         # Nitro berry: pulsing fill + spark
-        pulse = (math.sin(t*8) * 0.5 + 0.5) * 0.35 + 0.5
-        base = blend(NITRO_COLOR, (255, 100, 0), pulse)
-        rect = draw_cell(surf, f.pos, base, inset=4, border_radius=8)
-        # Spark glint
-        cx, cy = rect.center
-        pygame.draw.circle(surf, NITRO_SPARK, (cx, cy), 4)
+        surf.blit(NITRO_SURFS[int(t * NITRO_FRAME_RATE) % NITRO_FRAMES], (px, py))
         # Fuse bar
         if f.fuse_total > 0:
             pct = clamp(f.fuse / f.fuse_total, 0, 1)
             barw = int((TILE - 8) * pct)
-            barx, bary = rect.left + 4, rect.bottom + 2
+            barx, bary = px + 8, py + TILE - 2
             pygame.draw.rect(surf, (40,40,40), (barx, bary, TILE-8, 5), border_radius=3)
             pygame.draw.rect(surf, (255,180,80), (barx, bary, barw, 5), border_radius=3)
 
-def draw_rocks(surf, rocks):
-    for r in rocks:
-        rect = draw_cell(surf, r, ROCK_COLOR, inset=5, border_radius=6)
-        # Cracks
-        pygame.draw.line(surf, (80,80,95), (rect.left+4, rect.centery), (rect.centerx, rect.top+4), 2)
-        pygame.draw.line(surf, (80,80,95), (rect.centerx, rect.top+4), (rect.right-4, rect.bottom-4), 2)
+def draw_rocks(layer, new_rocks):
+    # Rocks only ever get added during a game, so stamp the new ones onto a persistent layer
+    for r in new_rocks:
+        layer.blit(ROCK_SURF, CELL_PX[r[1]][r[0]])
+    new_rocks.clear()
 
-def draw_snake(surf, snake):
+def draw_snake(surf, snake, ox=0, oy=0):
     # body
-    for i, c in enumerate(list(snake)[:-1]):
-        draw_cell(surf, c, BODY_COLOR, inset=5, border_radius=8)
-    # head glow
-    head = snake[-1]
-    hx, hy = grid_to_px(head)
-    center = (hx + TILE//2, hy + TILE//2)
-    pygame.draw.circle(surf, (0,0,0), center, TILE//2 + 8)
-    pygame.draw.circle(surf, (60, 200, 160), center, TILE//2 + 6, width=3)
-    draw_cell(surf, head, HEAD_COLOR, inset=4, border_radius=9)
-    # eyes
-    rect = pygame.Rect(hx+6, hy+6, TILE-12, TILE-12)
-    pygame.draw.circle(surf, (255,255,255), (rect.left+6, rect.centery), 3)
-    pygame.draw.circle(surf, (255,255,255), (rect.right-6, rect.centery), 3)
-    pygame.draw.circle(surf, (30,30,30), (rect.left+6, rect.centery), 1)
-    pygame.draw.circle(surf, (30,30,30), (rect.right-6, rect.centery), 1)
-
-def blend(a, b, t):
-    return tuple(int(a[i] + (b[i] - a[i]) * t) for i in range(3))
-
-def draw_explosions(surf, explosions, dt):
+    for c in islice(snake, len(snake) - 1):
+        px, py = CELL_PX[c[1]][c[0]]
+        surf.blit(BODY_SURF, (px + ox, py + oy))
+    # head (glow + eyes baked into the sprite)
+    hx, hy = grid_to_px(snake[-1])
+    surf.blit(HEAD_SURF, (hx - HEAD_PAD + ox, hy - HEAD_PAD + oy))
+
+def draw_explosions(overlay, explosions, dt):
+    # Draws into the SRCALPHA fx overlay; returns the touched rects for blit_overlay
+    dirty = []
     for ex in explosions:
         ex.t += dt
         if not ex.alive(): 
             continue
-        px, py = grid_to_px(ex.center)
-        cx, cy = px + TILE/2, py + TILE/2
+        cx, cy = CELL_CENTER[ex.center[1]][ex.center[0]]
         # ring expands and fades
         k = ex.t / ex.duration
         rad = (ex.radius_tiles * TILE) * (0.4 + 0.8*k)
         alpha = int(255 * (1 - k))
-        color = (*NITRO_SPARK, )
-        s = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-        pygame.draw.circle(s, (255, 210, 120, alpha), (cx, cy), int(rad), width=8)
-        pygame.draw.circle(s, (255, 140, 60, int(alpha*0.8)), (cx, cy), max(2, int(rad*0.65)), width=6)
-        surf.blit(s, (0, 0))
+        dirty.append(pygame.draw.circle(overlay, (255, 210, 120, alpha), (cx, cy), int(rad), width=8))
+        dirty.append(pygame.draw.circle(overlay, (255, 140, 60, int(alpha*0.8)), (cx, cy), max(2, int(rad*0.65)), width=6))
+    return dirty
 
 def clean_explosions(gs: GameState):
     gs.explosions = [e for e in gs.explosions if e.alive()]
 
-def draw_particles(surf, particles):
+def draw_particles(overlay, particles):
+    # Draws into the SRCALPHA fx overlay; returns the touched rects for blit_overlay
+    dirty = []
     for p in particles:
         x, y, vx, vy, life, r, g, b = p
         alpha = int(255 * clamp(life * 2.0, 0, 1))
-        pygame.draw.circle(surf, (r, g, b, alpha), (int(x), int(y)), 3)
-
-def draw_ui(surf, font, gs: GameState):
-    score_s = font.render(f"Score: {gs.score}", True, TEXT_COLOR)
-    best_s = font.render(f"Best: {gs.best}", True, TEXT_COLOR)
-    surf.blit(score_s, (MARGIN, 8))
-    surf.blit(best_s, (SCREEN_W - best_s.get_width() - MARGIN, 8))
-
-def shake_offset(gs: GameState):
+        dirty.append(pygame.draw.circle(overlay, (r, g, b, alpha), (int(x), int(y)), 3))
+    return dirty
+
+def blit_overlay(surf, overlay, dirty, ox=0, oy=0):
+    # Composite only the touched area of the persistent overlay, then clear it for next frame
+    if dirty:
+        area = dirty[0].unionall(dirty[1:])
+        surf.blit(overlay, area.move(ox, oy), area)
+        overlay.fill((0, 0, 0, 0), area)
+
+@lru_cache(maxsize=32)
+def render_text(font, text, color):
+    # Text only changes on score/state changes, so re-rasterize only then
+    return font.render(text, True, color).convert_alpha()
+
+def draw_ui(surf, font, gs: GameState, ox=0, oy=0):
+    score_s = render_text(font, f"Score: {gs.score}", TEXT_COLOR)
+    best_s = render_text(font, f"Best: {gs.best}", TEXT_COLOR)
+    surf.blit(score_s, (MARGIN + ox, 8 + oy))
+    surf.blit(best_s, (SCREEN_W - best_s.get_width() - MARGIN + ox, 8 + oy))
+
+def shake_offset(gs: GameState, dt: float):
     if gs.shake <= 0: 
         return 0, 0
     ox = random.uniform(-gs.shake, gs.shake)
     oy = random.uniform(-gs.shake, gs.shake)
-    gs.shake *= SHAKE_DECAY
+    gs.shake *= SHAKE_DECAY ** (dt * FPS)
     if gs.shake < 0.5:
         gs.shake = 0
     return int(ox), int(oy)
@@ -359,23 +471,43 @@ def shake_offset(gs: GameState):
 # ----------------------------
 def main():
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    vsync = 0 if "--no-vsync" in sys.argv[1:] else 1
+    try:
+        screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.SCALED, vsync=vsync)
+    except pygame.error:
+        # No vsync-capable renderer; clock.tick below still caps the frame rate
+        screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.SCALED)
     pygame.display.set_caption("Hungry Caterpillar: Explodo Snack")
+    build_assets()
     clock = pygame.time.Clock()
     font = pygame.font.Font(FONT_NAME, 20)
     bigfont = pygame.font.Font(FONT_NAME, 32)
+    # Full-screen layers, allocated once; everything else is drawn straight to the screen
+    fx_overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA).convert_alpha()
+    fx_overlay.fill((0, 0, 0, 0))
+    rocks_layer = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA).convert_alpha()
+    rocks_layer.fill((0, 0, 0, 0))
+    # Translucent dim for the pause / game-over screens
+    dim_layer = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA).convert_alpha()
+    dim_layer.fill((0, 0, 0, 120))
+    # Static background with the grid baked in, padded so shake never exposes an edge
+    pad = SHAKE_POWER
+    grid_bg = pygame.Surface((SCREEN_W + pad * 2, SCREEN_H + pad * 2)).convert()
+    grid_bg.fill(BG_COLOR)
+    draw_grid(grid_bg.subsurface((pad, pad, SCREEN_W, SCREEN_H)))
 
     gs = GameState()
     spawn_snake(gs)
     spawn_food(gs)
     spawn_rocks(gs, n=12)
 
-    time_accum = 0.0  # for movement step
+    step_time = time.monotonic()  # when the snake last moved
+    step_interval = 1.0 / FPS
     running = True
     t = 0.0
 
     while running:
-        dt = clock.tick(FPS) / 1000.0
+        dt = clock.tick(RENDER_FPS) / 1000.0
         t += dt
 
         # ---------------- events
@@ -391,6 +523,7 @@ def main():
                     # restart
                     gs.best = max(gs.best, gs.score)
                     gs = GameState(best=gs.best)
+                    rocks_layer.fill((0, 0, 0, 0))
                     spawn_snake(gs)
                     spawn_food(gs)
                     spawn_rocks(gs, n=12)
@@ -407,10 +540,12 @@ def main():
                         gs.dir = (0, 1)
 
         if gs.alive and not gs.paused:
-            time_accum += dt
-            # One movement step per frame (tied to FPS), simple & snappy
-            if time_accum >= (1.0 / FPS):
-                time_accum = 0.0
+            # One movement step per 1/FPS of wall time, simple & snappy
+            now = time.monotonic()
+            if now - step_time >= step_interval:
+                step_time += step_interval
+                if now - step_time >= step_interval:
+                    step_time = now  # fell behind (pause, stall): resync
                 step_snake(gs)
 
             update_food(gs, dt)
@@ -418,25 +553,23 @@ def main():
             clean_explosions(gs)
 
         # ---------------- draw
-        screen.fill(BG_COLOR)
-        ox, oy = shake_offset(gs)
+        ox, oy = shake_offset(gs, dt)
+        screen.blit(grid_bg, (ox - pad, oy - pad))
         # draw playfield with offset for shake
-        play = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-        draw_grid(play)
-        draw_rocks(play, gs.rocks)
-        draw_snake(play, gs.snake)
+        draw_rocks(rocks_layer, gs.new_rocks)
+        screen.blit(rocks_layer, (ox, oy))
+        draw_snake(screen, gs.snake, ox, oy)
         if gs.food:
-            draw_food(play, gs.food, t)
-        draw_explosions(play, gs.explosions, dt)
-        draw_particles(play, gs.particles)
-        draw_ui(play, font, gs)
-
-        screen.blit(play, (ox, oy))
+            draw_food(screen, gs.food, t, ox, oy)
+        dirty = draw_explosions(fx_overlay, gs.explosions, dt)
+        dirty += draw_particles(fx_overlay, gs.particles)
+        blit_overlay(screen, fx_overlay, dirty, ox, oy)
+        draw_ui(screen, font, gs, ox, oy)
 
         if gs.paused and gs.alive:
-            overlay_msg(screen, bigfont, "PAUSED", sub="Press P to resume")
+            overlay_msg(screen, dim_layer, bigfont, font, "PAUSED", sub="Press P to resume")
         if not gs.alive:
-            overlay_msg(screen, bigfont, "GAME OVER",
+            overlay_msg(screen, dim_layer, bigfont, font, "GAME OVER",
                         sub="Press R to restart")
 
         pygame.display.flip()
@@ -444,15 +577,12 @@ def main():
     pygame.quit()
     sys.exit()
 
-def overlay_msg(surf, font, title, sub=""):
-    s = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-    s.fill((0, 0, 0, 120))
-    surf.blit(s, (0, 0))
-    tt = font.render(title, True, (255, 255, 255))
+def overlay_msg(surf, dim, font, subfont, title, sub=""):
+    surf.blit(dim, (0, 0))
+    tt = render_text(font, title, (255, 255, 255))
     surf.blit(tt, ((SCREEN_W - tt.get_width()) // 2, SCREEN_H // 2 - 40))
     if sub:
-        f2 = pygame.font.Font(FONT_NAME, 20)
-        ss = f2.render(sub, True, (230, 230, 230))
+        ss = render_text(subfont, sub, (230, 230, 230))
         surf.blit(ss, ((SCREEN_W - ss.get_width()) // 2, SCREEN_H // 2 + 5))
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import pygame
 import random
+from collections import deque
 from enum import Enum
 
 # Initialize Pygame
@@ -11,6 +12,12 @@ WINDOW_HEIGHT = 600
 GRID_SIZE = 20
 GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
 GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+MOVE_INTERVAL_MS = 100  # game speed: one snake step per 100 ms
+FPS = 60  # input polling rate, independent of game speed
+# Plain software window surface, on purpose: the renderer only touches a few cells per step
+# and pushes them with display.update(rects). SCALED/OPENGL would put an SDL renderer in
+# between and upload the whole frame as a texture every time.
+DISPLAY_FLAGS = 0
 
 # Colors
 BLACK = (0, 0, 0)
@@ -26,37 +33,104 @@ class Direction(Enum):
     LEFT = (-1, 0)
     RIGHT = (1, 0)
 
+# Plain (dx, dy) per Direction, so the hot path skips Enum .value lookups
+_DIR_VALUES = {d: d.value for d in Direction}
+
+# Event types main() handles; SDL drops everything else
+HANDLED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.WINDOWEXPOSED]
+
+_KEY_TO_DIR = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT,
+}
+
+# Cells are packed into one int, x * GRID_HEIGHT + y: cheaper to hash and store than (x, y) tuples
+def _enc(x, y):
+    return x * GRID_HEIGHT + y
+
+def _dec(cell):
+    return divmod(cell, GRID_HEIGHT)
+
+# Set of grid cells that also supports O(1) uniform random picks
+class FreeCells:
+    def __init__(self, cells):
+        self._cells = list(cells)
+        self._index = {cell: i for i, cell in enumerate(self._cells)}
+    
+    def add(self, cell):
+        if cell not in self._index:
+            self._index[cell] = len(self._cells)
+            self._cells.append(cell)
+    
+    def discard(self, cell):
+        i = self._index.pop(cell, None)
+        if i is None:
+            return
+        # Swap-pop: move the last cell into the hole
+        last = self._cells.pop()
+        if i < len(self._cells):
+            self._cells[i] = last
+            self._index[last] = i
+    
+    def choice(self):
+        # None once the snake covers the whole board
+        return random.choice(self._cells) if self._cells else None
+
 class Snake:
     def __init__(self):
-        self.body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        self.body = deque([_enc(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
+        self.body_set = set(self.body)
+        # Grid cells the body does not cover; kept in sync by move()
+        self.free_cells = FreeCells(cell for cell in range(GRID_WIDTH * GRID_HEIGHT)
+                                    if cell not in self.body_set)
         self.direction = Direction.RIGHT
+        self._dx, self._dy = _DIR_VALUES[self.direction]
         self.grow = False
+        self.hit_wall = False
+        # Cells changed by the last move, for dirty-rect drawing
+        self.new_head = self.body[0]
+        self.old_tail = None
     
     def move(self):
-        head_x, head_y = self.body[0]
-        dx, dy = self.direction.value
-        new_head = (head_x + dx, head_y + dy)
+        head_x, head_y = _dec(self.body[0])
+        head_x += self._dx
+        head_y += self._dy
+        if head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT:
+            # A packed cell can't point off the board, so stop at the wall and flag it
+            self.hit_wall = True
+            self.old_tail = None
+            return
+        new_head = _enc(head_x, head_y)
         
-        self.body.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self.body_set.add(new_head)
+        self.free_cells.discard(new_head)
+        self.new_head = new_head
         if not self.grow:
-            self.body.pop()
+            self.old_tail = self.body.pop()
+            # Head moved into the cell the tail just vacated; keep it in the set
+            if self.old_tail != new_head:
+                self.body_set.discard(self.old_tail)
+                self.free_cells.add(self.old_tail)
         else:
+            self.old_tail = None
             self.grow = False
     
     def change_direction(self, new_direction):
         # Prevent moving in opposite direction
-        dx_current, dy_current = self.direction.value
-        dx_new, dy_new = new_direction.value
-        if (dx_current, dy_current) != (-dx_new, -dy_new):
+        ndx, ndy = _DIR_VALUES[new_direction]
+        if self._dx != -ndx or self._dy != -ndy:
             self.direction = new_direction
+            self._dx, self._dy = ndx, ndy
     
     def check_collision(self):
-        head_x, head_y = self.body[0]
-        # Check wall collision
-        if head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT:
+        # Check wall collision (found by move())
+        if self.hit_wall:
             return True
-        # Check self collision
-        if self.body[0] in self.body[1:]:
+        # Check self collision (a repeated cell collapses in the set)
+        if len(self.body_set) != len(self.body):
             return True
         return False
     
@@ -67,85 +141,166 @@ class Snake:
         return False
 
 class Food:
-    def __init__(self, snake_body):
-        self.position = self.generate_position(snake_body)
+    def __init__(self, free_cells):
+        self.position = self.generate_position(free_cells)
     
-    def generate_position(self, snake_body):
-        while True:
-            pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if pos not in snake_body:
-                return pos
+    def generate_position(self, free_cells):
+        # Sample straight from the free cells; O(1), no retries as the board fills up
+        return free_cells.choice()
 
-def draw_grid(screen):
+def _build_background():
+    # The grid never changes: render it once and blit (or erase cells from) it afterwards.
+    # Needs the display mode set, for convert().
+    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    background.fill(BLACK)
     for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-        pygame.draw.line(screen, (40, 40, 40), (x, 0), (x, WINDOW_HEIGHT))
+        pygame.draw.line(background, (40, 40, 40), (x, 0), (x, WINDOW_HEIGHT))
     for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
-        pygame.draw.line(screen, (40, 40, 40), (0, y), (WINDOW_WIDTH, y))
+        pygame.draw.line(background, (40, 40, 40), (0, y), (WINDOW_WIDTH, y))
+    return background
+
+def _make_tile(color):
+    # Fill plus 1px black outline, baked once instead of two draw.rect calls per cell
+    tile = pygame.Surface((GRID_SIZE, GRID_SIZE))
+    tile.fill(color)
+    pygame.draw.rect(tile, BLACK, tile.get_rect(), 1)
+    return tile
+
+HEAD_TILE = _make_tile(GREEN)
+BODY_TILE = _make_tile(DARK_GREEN)
+FOOD_TILE = _make_tile(RED)
+
+def _convert_tiles():
+    # Needs the display mode set; main() calls this right after set_mode
+    global HEAD_TILE, BODY_TILE, FOOD_TILE
+    HEAD_TILE = HEAD_TILE.convert()
+    BODY_TILE = BODY_TILE.convert()
+    FOOD_TILE = FOOD_TILE.convert()
 
-def draw_snake(screen, snake):
-    for i, (x, y) in enumerate(snake.body):
-        color = GREEN if i == 0 else DARK_GREEN
-        rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-        pygame.draw.rect(screen, color, rect)
-        pygame.draw.rect(screen, BLACK, rect, 1)
+# One shared Rect per grid cell, indexed by packed cell, so drawing and erasing allocate
+# nothing per frame. Treat them as read-only: they also end up in the dirty list for display.update().
+_CELL_RECTS = [pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+               for x, y in map(_dec, range(GRID_WIDTH * GRID_HEIGHT))]
+
+def cell_rect(cell):
+    return _CELL_RECTS[cell]
+
+def draw_tile(screen, cell, tile):
+    rect = cell_rect(cell)
+    screen.blit(tile, rect)
+    return rect
+
+def clear_cell(screen, background, cell):
+    rect = cell_rect(cell)
+    screen.blit(background, rect, rect)
+    return rect
+
+def draw_snake(screen, snake, area=None):
+    # Hand the whole body to SDL in one blits() call instead of one blit per cell
+    tiles = [(BODY_TILE, cell_rect(cell)) for cell in snake.body]
+    tiles[0] = (HEAD_TILE, tiles[0][1])
+    if area is not None:
+        tiles = [tile for tile in tiles if area.colliderect(tile[1])]
+    screen.blits(tiles, doreturn=False)
 
 def draw_food(screen, food):
-    x, y = food.position
-    rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-    pygame.draw.rect(screen, RED, rect)
-    pygame.draw.rect(screen, BLACK, rect, 1)
+    return draw_tile(screen, food.position, FOOD_TILE)
+
+def render_text(font, text, color):
+    # Cached text gets blitted many times, so match the display format up front
+    return font.render(text, True, color).convert_alpha()
+
+def render_score(score, font):
+    return render_text(font, f'Score: {score}', WHITE)
+
+def draw_score(screen, score_surface):
+    return screen.blit(score_surface, (10, 10))
 
-def draw_score(screen, score, font):
-    score_text = font.render(f'Score: {score}', True, WHITE)
-    screen.blit(score_text, (10, 10))
+def redraw_score(screen, background, snake, food, score_surface, old_rect):
+    # The score sits on top of the playfield, so rebuild everything under it
+    area = old_rect.union(score_surface.get_rect(topleft=(10, 10)))
+    screen.blit(background, area, area)
+    draw_snake(screen, snake, area)
+    if food.position is not None and area.colliderect(cell_rect(food.position)):
+        draw_food(screen, food)
+    draw_score(screen, score_surface)
+    return area
 
-def game_over_screen(screen, score, font):
+def game_over_screen(screen, game_over_text, score_text, restart_text):
     screen.fill(BLACK)
-    game_over_text = font.render('Game Over!', True, RED)
-    score_text = font.render(f'Final Score: {score}', True, WHITE)
-    restart_text = font.render('Press SPACE to restart or ESC to quit', True, WHITE)
-    
     screen.blit(game_over_text, (WINDOW_WIDTH // 2 - game_over_text.get_width() // 2, WINDOW_HEIGHT // 2 - 60))
     screen.blit(score_text, (WINDOW_WIDTH // 2 - score_text.get_width() // 2, WINDOW_HEIGHT // 2))
     screen.blit(restart_text, (WINDOW_WIDTH // 2 - restart_text.get_width() // 2, WINDOW_HEIGHT // 2 + 60))
 
 def main():
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), DISPLAY_FLAGS)
     pygame.display.set_caption('Snake Game')
+    _convert_tiles()
+    # Only these event types matter; let SDL drop mouse/motion/etc. before Python sees them
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(HANDLED_EVENTS)
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 36)
     
+    background = _build_background()
+    # Text only changes when the score does, so render it on change
+    game_over_text = render_text(font, 'Game Over!', RED)
+    restart_text = render_text(font, 'Press SPACE to restart or ESC to quit', WHITE)
+    final_score_text = None
+    
     snake = Snake()
-    food = Food(snake.body)
+    food = Food(snake.free_cells)
     score = 0
+    score_surface = render_score(score, font)
     game_over = False
+    game_over_shown = False
+    full_redraw = True
+    score_rect = pygame.Rect(10, 10, 0, 0)
+    last_move = pygame.time.get_ticks()
     
     while True:
-        for event in pygame.event.get():
+        if game_over_shown:
+            # The game-over screen is static: sleep until a key or expose event instead of redrawing it
+            events = [pygame.event.wait()] + pygame.event.get(HANDLED_EVENTS)
+        else:
+            clock.tick(FPS)
+            events = pygame.event.get(HANDLED_EVENTS)
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
             
+            if event.type == pygame.WINDOWEXPOSED:
+                # Uncovered or restored: only dirty cells get repainted, so redo the whole frame
+                full_redraw = True
+                game_over_shown = False
+            
             if event.type == pygame.KEYDOWN:
                 if game_over:
                     if event.key == pygame.K_SPACE:
                         # Restart game
                         snake = Snake()
-                        food = Food(snake.body)
+                        food = Food(snake.free_cells)
                         score = 0
+                        score_surface = render_score(score, font)
                         game_over = False
+                        game_over_shown = False
+                        full_redraw = True
                     elif event.key == pygame.K_ESCAPE:
                         pygame.quit()
                         return
                 else:
-                    if event.key == pygame.K_UP:
-                        snake.change_direction(Direction.UP)
-                    elif event.key == pygame.K_DOWN:
-                        snake.change_direction(Direction.DOWN)
-                    elif event.key == pygame.K_LEFT:
-                        snake.change_direction(Direction.LEFT)
-                    elif event.key == pygame.K_RIGHT:
-                        snake.change_direction(Direction.RIGHT)
+                    direction = _KEY_TO_DIR.get(event.key)
+                    if direction is not None:
+                        snake.change_direction(direction)
+        
+        # The game steps on its own clock; between steps nothing on screen changes
+        now = pygame.time.get_ticks()
+        if now - last_move < MOVE_INTERVAL_MS:
+            continue
+        last_move += MOVE_INTERVAL_MS
+        if now - last_move >= MOVE_INTERVAL_MS:
+            last_move = now  # fell behind (stall): resync instead of bursting
         
         if not game_over:
             snake.move()
@@ -153,20 +308,43 @@ def main():
             if snake.check_collision():
                 game_over = True
             
-            if snake.eat_food(food.position):
+            ate = snake.eat_food(food.position)
+            if ate:
                 score += 10
-                food = Food(snake.body)
+                score_surface = render_score(score, font)
+                food = Food(snake.free_cells)
+                if food.position is None:
+                    # The snake fills the board: nothing left to eat, so the game ends
+                    game_over = True
+            if game_over:
+                final_score_text = render_text(font, f'Final Score: {score}', WHITE)
             
-            screen.fill(BLACK)
-            draw_grid(screen)
-            draw_snake(screen, snake)
-            draw_food(screen, food)
-            draw_score(screen, score, font)
+            if full_redraw:
+                screen.blit(background, (0, 0))
+                draw_snake(screen, snake)
+                if food.position is not None:
+                    draw_food(screen, food)
+                score_rect = draw_score(screen, score_surface)
+                pygame.display.flip()
+                full_redraw = False
+            else:
+                # Only the vacated tail, new food, old head and new head change per tick
+                dirty = []
+                if snake.old_tail is not None:
+                    dirty.append(clear_cell(screen, background, snake.old_tail))
+                if ate and food.position is not None:
+                    dirty.append(draw_food(screen, food))
+                if len(snake.body) > 1:
+                    dirty.append(draw_tile(screen, snake.body[1], BODY_TILE))
+                dirty.append(draw_tile(screen, snake.new_head, HEAD_TILE))
+                if ate or score_rect.collidelist(dirty) != -1:
+                    score_rect = redraw_score(screen, background, snake, food, score_surface, score_rect)
+                    dirty.append(score_rect)
+                pygame.display.update(dirty)
         else:
-            game_over_screen(screen, score, font)
-        
-        pygame.display.flip()
-        clock.tick(10)
+            game_over_screen(screen, game_over_text, final_score_text, restart_text)
+            pygame.display.flip()
+            game_over_shown = True
 
 if __name__ == '__main__':
     main()